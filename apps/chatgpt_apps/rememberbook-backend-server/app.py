@@ -1,17 +1,35 @@
-from flask import Flask, request
+import os
+
+from flask import Flask, Response, request, stream_with_context
 from flask_restful import Api, Resource
 from flask_cors import CORS
-from models import IdeaStore
+from models import IdeaStore, UrgencyLevel
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 api = Api(app)
 
+# ---------------------------------------------------------------------------
+# Configuration (override via environment variables)
+PORT = int(os.environ.get("PORT", "5055"))
+HOST = os.environ.get("HOST", "0.0.0.0")
+DB_PATH = os.environ.get("REMEMBERBOOK_DB", "rememberbook.db")
+# Debug mode (interactive debugger + reloader) is opt-in for local work
+DEBUG = os.environ.get("FLASK_DEBUG", "").lower() in ("1", "true")
+
 # ---------------------------------------------------------------------------
 # Global idea store (SQLite-backed)
 idea_store = IdeaStore(DB_PATH)
 
 
+_VALID_URGENCY = frozenset(level.value for level in UrgencyLevel)
+
+
+def is_valid_urgency(value) -> bool:
+    # Exact type check: bool is an int subclass, so True would otherwise pass
+    return type(value) is int and value in _VALID_URGENCY
+
+
 class IdeaListResource(Resource):
     def get(self):
         """
@@ -30,6 +48,12 @@ class IdeaListResource(Resource):
             type: boolean
             required: false
             description: Return only archived ideas when true (overrides includeArchived)
+          - in: query
+            name: format
+            type: string
+            enum: [json, ndjson]
+            required: false
+            description: Use "ndjson" to stream one idea per line (application/x-ndjson)
         responses:
           200:
             description: List of ideas
@@ -66,12 +90,23 @@ class IdeaListResource(Resource):
             request.args.get("includeArchived", "false").lower() == "true"
         )
         archived_only = request.args.get("archivedOnly", "false").lower() == "true"
-        ideas = idea_store.get_all_ideas()
-        if archived_only:
-            ideas = [i for i in ideas if i.archived]
-        elif not include_archived:
-            ideas = [i for i in ideas if not i.archived]
-        return [idea.to_dict() for idea in ideas]
+        archived = idea_store.archived_filter(archived_only, include_archived)
+
+        if request.args.get("format") == "ndjson":
+            # One JSON object per line, sent while rows are still being read
+            def generate_ndjson():
+                for blob in idea_store.iter_idea_blobs(archived):
+                    yield blob + b"\n"
+
+            return Response(
+                stream_with_context(generate_ndjson()),
+                mimetype="application/x-ndjson",
+            )
+
+        # Ideas arrive pre-encoded (and cached), so join them into the
+        # array directly instead of re-serialising through to_dict().
+        blobs = idea_store.iter_idea_blobs(archived)
+        return Response(b"[" + b",".join(blobs) + b"]", mimetype="application/json")
 
     def post(self):
         """
@@ -133,7 +168,7 @@ class IdeaListResource(Resource):
         description = data["description"]
         urgency = data.get("urgency", 3)
 
-        if urgency not in range(1, 6):
+        if not is_valid_urgency(urgency):
             return {"error": "Urgency must be between 1 and 5"}, 400
 
         idea = idea_store.create_idea(title, description, urgency)
@@ -263,19 +298,18 @@ class IdeaResource(Resource):
           400:
             description: Bad request
         """
-        idea = idea_store.get_idea(idea_id)
-        if not idea:
-            return {"error": "Idea not found"}, 404
-
         data = request.get_json()
         if not data:
             return {"error": "No data provided"}, 400
 
         # Validate urgency if provided
-        if "urgency" in data and data["urgency"] not in range(1, 6):
+        if "urgency" in data and not is_valid_urgency(data["urgency"]):
             return {"error": "Urgency must be between 1 and 5"}, 400
 
+        # Single UPDATE ... RETURNING; no row back means the id is unknown
         updated_idea = idea_store.update_idea(idea_id, **data)
+        if not updated_idea:
+            return {"error": "Idea not found"}, 404
         return updated_idea.to_dict()
 
     def delete(self, idea_id):
@@ -319,11 +353,8 @@ class IdeaArchiveResource(Resource):
           404:
             description: Idea not found
         """
-        idea = idea_store.get_idea(idea_id)
-        if not idea:
+        if not idea_store.set_archived(idea_id, True):
             return {"error": "Idea not found"}, 404
-        if not idea.archived:
-            idea_store.update_idea(idea_id, archived=True)
         return {"message": "Idea archived", "id": idea_id}
 
 
@@ -345,16 +376,47 @@ class IdeaRestoreResource(Resource):
           404:
             description: Idea not found
         """
-        idea = idea_store.get_idea(idea_id)
-        if not idea:
+        if not idea_store.set_archived(idea_id, False):
             return {"error": "Idea not found"}, 404
-        if idea.archived:
-            idea_store.update_idea(idea_id, archived=False)
         return {"message": "Idea restored", "id": idea_id}
 
 
+class IdeaStatsResource(Resource):
+    def get(self):
+        """
+        Get idea counts by urgency and archived state
+        ---
+        tags:
+          - Ideas
+        responses:
+          200:
+            description: Aggregated idea statistics
+            schema:
+              type: object
+              properties:
+                total:
+                  type: integer
+                active:
+                  type: integer
+                archived:
+                  type: integer
+                by_urgency:
+                  type: object
+                  description: Keyed by urgency level ("1".."5")
+                  additionalProperties:
+                    type: object
+                    properties:
+                      active:
+                        type: integer
+                      archived:
+                        type: integer
+        """
+        return idea_store.get_stats()
+
+
 # Register API routes
 api.add_resource(IdeaListResource, "/ideas")
+api.add_resource(IdeaStatsResource, "/ideas/stats")
 api.add_resource(IdeaResource, "/ideas/<string:idea_id>")
 api.add_resource(IdeaArchiveResource, "/ideas/<string:idea_id>/archive")
 api.add_resource(IdeaRestoreResource, "/ideas/<string:idea_id>/restore")
@@ -374,6 +436,7 @@ def home():
         "version": "1.0.0",
         "endpoints": {
             "GET /ideas": "Get all ideas",
+            "GET /ideas/stats": "Get idea counts by urgency",
             "POST /ideas": "Create a new idea",
             "GET /ideas/<id>": "Get a specific idea",
             "PUT /ideas/<id>": "Update an idea",
@@ -395,15 +458,20 @@ def home():
 if __name__ == "__main__":
     # Seed sample data only if database is empty (first run)
     if idea_store.is_empty():
-        idea_store.create_idea(
-            "Learn Python", "Start with basic syntax and data structures", 4
+        idea_store.bulk_create(
+            [
+                ("Learn Python", "Start with basic syntax and data structures", 4),
+                ("Buy groceries", "Milk, bread, eggs, and vegetables", 3),
+                ("Call mom", "Weekly check-in call", 2),
+            ]
         )
-        idea_store.create_idea("Buy groceries", "Milk, bread, eggs, and vegetables", 3)
-        idea_store.create_idea("Call mom", "Weekly check-in call", 2)
 
     print("Remember Book API Server starting...")
     print(f"Using database file: {DB_PATH}")
     print(f"Listening on: http://localhost:{PORT}")
     print(f"API Documentation: http://localhost:{PORT}/apidocs")
     print("Change port with PORT env var, e.g. PORT=7000 uv run python app.py")
-    app.run(debug=True, host=HOST, port=PORT)
+    print("For multiple workers use: uv run gunicorn app:app")
+    # Development server only; production traffic should go through gunicorn
+    # (see gunicorn.conf.py) so requests are served by parallel workers.
+    app.run(debug=DEBUG, host=HOST, port=PORT, threaded=True)
@@ -0,0 +1,21 @@
+"""Gunicorn settings for serving Remember Book with multiple workers.
+
+Picked up automatically when running from this directory:
+
+    uv run gunicorn app:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5055')}"
+
+# One process per core. Every worker imports app.py and opens its own
+# IdeaStore connection pool, so the app must not be preloaded (SQLite
+# connections cannot be shared across fork).
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+preload_app = False
+
+# Threads per worker; matches IdeaStore's default read-only pool size.
+worker_class = "gthread"
+threads = 4
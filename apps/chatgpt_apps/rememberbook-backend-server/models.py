@@ -1,19 +1,43 @@
 """Domain models and persistence layer for Remember Book.
 
 Originally this project used an in-memory store. It now persists data
-to a lightweight on-disk SQLite database (standard library only) so
-ideas survive server restarts. The API surface (IdeaStore methods)
-remains the same for the Flask resources to stay unchanged except for
-initialisation (passing a db path).
+to a lightweight on-disk SQLite database (standard library `sqlite3`,
+notes encoded with `orjson`) so ideas survive server restarts. The API
+surface (IdeaStore methods) remains the same for the Flask resources to
+stay unchanged except for initialisation (passing a db path).
 """
 
 from datetime import datetime
 from enum import Enum
-from typing import List, Dict, Optional, Union, Any
+from typing import List, Dict, Optional, Tuple, Union, Any, Iterator
+from collections import OrderedDict
+from contextlib import contextmanager
 import uuid
 import sqlite3
 import os
-import json
+import queue
+import threading
+
+import orjson
+
+
+# Applied to every pooled connection. synchronous=NORMAL is safe in WAL
+# mode and saves one fsync per commit; the rest keep temp data and hot
+# pages in memory (mmap 256 MiB, page cache ~20 MB).
+SESSION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+)
+
+
+# Rows fetched per read-connection checkout when streaming list responses
+LIST_PAGE_SIZE = 256
+
+
+# Bump when `IdeaStore._migrate` gains a step; stored in PRAGMA user_version.
+SCHEMA_VERSION = 3
 
 
 class UrgencyLevel(Enum):
@@ -24,6 +48,56 @@ class UrgencyLevel(Enum):
     NOT_IMPORTANT = 1
 
 
+def normalize_notes(notes: Any, now: str) -> List[Dict[str, str]]:
+    """Coerce note input into the stored `{"text", "timestamp"}` format.
+
+    Accepts a plain string, a note object, or a list mixing both. Blank
+    notes are dropped and missing timestamps default to `now`.
+    """
+    if isinstance(notes, (str, dict)):
+        notes = [notes]
+    elif not isinstance(notes, list):
+        return []
+    normalized: List[Dict[str, str]] = []
+    for n in notes:
+        if isinstance(n, dict) and "text" in n:
+            text_val = str(n["text"]).strip()
+            if text_val:
+                # preserve provided timestamp or add current
+                ts = n.get("timestamp") or now
+                normalized.append({"text": text_val, "timestamp": ts})
+        elif isinstance(n, str):
+            txt = n.strip()
+            if txt:
+                normalized.append({"text": txt, "timestamp": now})
+    return normalized
+
+
+def decode_notes(raw_notes: Optional[str], now: str) -> List[Dict[str, str]]:
+    """Decode a stored notes column, upgrading previous formats.
+
+    Older rows may hold a plain string (single note w/o timestamp), a JSON
+    list of strings, a JSON object for one note, or the current list of
+    note objects. Timestamps that are missing become `now`.
+    """
+    try:
+        parsed = orjson.loads(raw_notes)
+    except Exception:
+        if raw_notes and raw_notes.strip():
+            return [{"text": raw_notes.strip(), "timestamp": now}]
+        return []
+    # Fast path: everything written by this version (and rows rewritten by
+    # schema migration 3) is already a list of note objects, so skip
+    # per-note validation.
+    if parsed.__class__ is list:
+        if not parsed:
+            return parsed
+        first = parsed[0]
+        if first.__class__ is dict and "text" in first and "timestamp" in first:
+            return parsed
+    return normalize_notes(parsed, now)
+
+
 class Idea:
     def __init__(
         self, title: str, description: str, urgency: UrgencyLevel = UrgencyLevel.MEDIUM
@@ -35,8 +109,9 @@ class Idea:
         self.notes: List[Dict[str, str]] = []  # persisted as JSON string in the DB
         self.urgency = urgency.value
         self.archived = False  # new flag for archived ideas
-        self.created_date = datetime.now().isoformat()
-        self.updated_date = datetime.now().isoformat()
+        now = datetime.now().isoformat()
+        self.created_date = now
+        self.updated_date = now
 
     def to_dict(self) -> Dict:
         return {
@@ -58,39 +133,19 @@ class Idea:
         urgency: Optional[int] = None,
         archived: Optional[bool] = None,
     ):
+        now = datetime.now().isoformat()
         if title is not None:
             self.title = title
         if description is not None:
             self.description = description
         # Notes semantics: append new note(s) instead of overwrite
         if notes is not None:
-            now = datetime.now().isoformat()
-            if isinstance(notes, list):
-                for n in notes:
-                    if isinstance(n, dict) and "text" in n:
-                        text_val = str(n["text"]).strip()
-                        if text_val:
-                            # preserve provided timestamp or add current
-                            ts = n.get("timestamp") or now
-                            self.notes.append({"text": text_val, "timestamp": ts})
-                    elif isinstance(n, str):
-                        txt = n.strip()
-                        if txt:
-                            self.notes.append({"text": txt, "timestamp": now})
-            elif isinstance(notes, dict) and "text" in notes:
-                txt = str(notes["text"]).strip()
-                if txt:
-                    ts = notes.get("timestamp") or now
-                    self.notes.append({"text": txt, "timestamp": ts})
-            elif isinstance(notes, str):
-                txt = notes.strip()
-                if txt:
-                    self.notes.append({"text": txt, "timestamp": now})
+            self.notes.extend(normalize_notes(notes, now))
         if urgency is not None:
             self.urgency = urgency
         if archived is not None:
             self.archived = bool(archived)
-        self.updated_date = datetime.now().isoformat()
+        self.updated_date = now
 
 
 class IdeaStore:
@@ -98,22 +153,115 @@ class IdeaStore:
 
     The database file is created automatically if it does not exist.
     Table schema is created with a single `ideas` table.
+
+    Connections are long-lived: a single read-write connection (SQLite
+    only allows one writer at a time) guarded by a lock, plus a small
+    pool of read-only connections shared by request threads. This avoids
+    opening and closing the database file on every request.
     """
 
-    def __init__(self, db_path: str = "rememberbook.db"):
+    def __init__(
+        self,
+        db_path: str = "rememberbook.db",
+        pool_size: int = 4,
+        cache_size: int = 1024,
+    ):
         self.db_path = db_path
+        # Create directory if user points to a nested path
+        directory = os.path.dirname(self.db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._rw_conn = self._open_connection()
+        self._rw_lock = threading.Lock()
         self._ensure_db()
+        # Read-only connections are opened after the schema exists
+        self._ro_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            self._ro_pool.put(self._open_connection(readonly=True))
+        # Encoded `to_dict()` JSON per idea: id -> (updated_date, blob).
+        # Entries are validated against the row's updated_date on read and
+        # dropped on every write, so they can never serve stale data. At
+        # most `cache_size` entries are kept; the least recently used go first.
+        self._dict_cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
 
     # --- internal helpers -------------------------------------------------
-    def _connect(self):
-        return sqlite3.connect(self.db_path)
+    def _open_connection(self, readonly: bool = False) -> sqlite3.Connection:
+        # Autocommit mode: single statements commit immediately, multi
+        # statement writes open an explicit transaction.
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        # Name-based column access, backed by the C-level Row type
+        conn.row_factory = sqlite3.Row
+        for pragma in SESSION_PRAGMAS:
+            conn.execute(pragma)
+        if readonly:
+            conn.execute("PRAGMA query_only=1")
+        return conn
+
+    @contextmanager
+    def _acquire(self, readonly: bool = True):
+        """Borrow a pooled connection for the duration of a `with` block."""
+        if not readonly:
+            with self._rw_lock:
+                yield self._rw_conn
+            return
+        conn = self._ro_pool.get()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        self._ro_pool.put(conn)
+
+    def _cached_blob(self, idea_id: str, updated_date: str) -> Optional[bytes]:
+        with self._cache_lock:
+            cached = self._dict_cache.get(idea_id)
+            if cached is None or cached[0] != updated_date:
+                return None
+            self._dict_cache.move_to_end(idea_id)
+            return cached[1]
+
+    def _cache_blob(self, idea_id: str, updated_date: str, blob: bytes) -> None:
+        with self._cache_lock:
+            self._dict_cache[idea_id] = (updated_date, blob)
+            self._dict_cache.move_to_end(idea_id)
+            while len(self._dict_cache) > self._cache_size:
+                self._dict_cache.popitem(last=False)
+
+    def _invalidate(self, idea_id: str) -> None:
+        with self._cache_lock:
+            self._dict_cache.pop(idea_id, None)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._rw_lock:
+            self._rw_conn.close()
+        while not self._ro_pool.empty():
+            self._ro_pool.get_nowait().close()
 
     def _ensure_db(self):
-        # Create directory if user points to a nested path
-        directory = os.path.dirname(self.db_path)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
-        with self._connect() as conn:
+        # Schema changes are tracked with SQLite's `user_version`, so warm
+        # starts only read one integer.
+        with self._acquire(readonly=False) as conn:
+            # WAL is persisted in the database file; readers no longer
+            # block on (or get blocked by) an in-flight write.
+            conn.execute("PRAGMA journal_mode=WAL")
+            (version,) = conn.execute("PRAGMA user_version").fetchone()
+            if version < SCHEMA_VERSION:
+                with conn:
+                    # Take the write lock up front and re-read the version:
+                    # several server workers may start at the same time.
+                    conn.execute("BEGIN IMMEDIATE")
+                    (version,) = conn.execute("PRAGMA user_version").fetchone()
+                    self._migrate(conn, version)
+                    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _migrate(self, conn: sqlite3.Connection, version: int) -> None:
+        if version < 1:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS ideas (
@@ -135,85 +283,115 @@ class IdeaStore:
                 conn.execute(
                     "ALTER TABLE ideas ADD COLUMN archived INTEGER NOT NULL DEFAULT 0"
                 )
-            conn.commit()
+        if version < 2:
+            # Serves the archived filter + newest-first ordering of list views
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_ideas_archived_created ON ideas(archived, created_date DESC)"
+            )
+            # Unfiltered listings: scanned backwards, this yields
+            # (created_date DESC, rowid DESC) without a sort per page
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_ideas_created ON ideas(created_date)"
+            )
+        if version < 3:
+            # Rewrite legacy notes as JSON arrays of note objects so updates
+            # can append inside SQLite with json_insert. Every note goes
+            # through normalize_notes, not decode_notes, whose fast path
+            # only looks at the first one.
+            now = datetime.now().isoformat()
+            rows = conn.execute("SELECT id, notes FROM ideas").fetchall()
+            for idea_id, raw_notes in rows:
+                try:
+                    parsed = orjson.loads(raw_notes)
+                except (orjson.JSONDecodeError, TypeError):
+                    # Plain-text note (or NULL); normalize_notes handles both
+                    parsed = raw_notes
+                notes = orjson.dumps(normalize_notes(parsed, now)).decode()
+                if notes != raw_notes:
+                    conn.execute(
+                        "UPDATE ideas SET notes=? WHERE id=?", (notes, idea_id)
+                    )
 
     # --- CRUD operations --------------------------------------------------
     def create_idea(self, title: str, description: str, urgency: int = 3) -> Idea:
         urgency_level = UrgencyLevel(urgency)
         idea = Idea(title, description, urgency_level)
-        with self._connect() as conn:
+        with self._acquire(readonly=False) as conn:
             conn.execute(
                 "INSERT INTO ideas (id, title, description, notes, urgency, archived, created_date, updated_date) VALUES (?,?,?,?,?,?,?,?)",
                 (
                     idea.id,
                     idea.title,
                     idea.description,
-                    json.dumps(idea.notes),
+                    orjson.dumps(idea.notes).decode(),
                     idea.urgency,
                     0,
                     idea.created_date,
                     idea.updated_date,
                 ),
             )
-            conn.commit()
+        self._invalidate(idea.id)
         return idea
 
-    def _row_to_idea(self, row) -> Idea:
-        # row order must match SELECT columns
-        idea = Idea(row[1], row[2], UrgencyLevel(row[4]))
-        idea.id = row[0]
-        raw_notes = row[3]
-        # Backwards compatibility handling for previous formats:
-        # 1. Plain string (single note w/o timestamp)
-        # 2. JSON list of strings
-        # 3. Already in new format (list of objects)
-        # 4. JSON object representing one note
-        try:
-            parsed = json.loads(raw_notes)
-            if isinstance(parsed, list):
-                converted: List[Dict[str, str]] = []
-                for item in parsed:
-                    if isinstance(item, dict) and "text" in item:
-                        text_val = str(item["text"]).strip()
-                        if text_val:
-                            ts = item.get("timestamp") or datetime.now().isoformat()
-                            converted.append({"text": text_val, "timestamp": ts})
-                    elif isinstance(item, str):
-                        txt = item.strip()
-                        if txt:
-                            converted.append(
-                                {"text": txt, "timestamp": datetime.now().isoformat()}
-                            )
-                idea.notes = converted
-            elif isinstance(parsed, dict) and "text" in parsed:
-                txt = str(parsed["text"]).strip()
-                if txt:
-                    ts = parsed.get("timestamp") or datetime.now().isoformat()
-                    idea.notes = [{"text": txt, "timestamp": ts}]
-            elif isinstance(parsed, str):
-                txt = parsed.strip()
-                idea.notes = (
-                    [{"text": txt, "timestamp": datetime.now().isoformat()}]
-                    if txt
-                    else []
+    def bulk_create(self, items: List[Tuple[str, str, int]]) -> List[Idea]:
+        """Create several ideas from (title, description, urgency) tuples.
+
+        All rows are inserted with one `executemany` inside a single
+        transaction, so the batch costs one commit instead of one per idea.
+        """
+        ideas = [Idea(t, d, UrgencyLevel(u)) for t, d, u in items]
+        notes = orjson.dumps([]).decode()
+        with self._acquire(readonly=False) as conn:
+            with conn:  # commits once on success, rolls back on error
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT INTO ideas (id, title, description, notes, urgency, archived, created_date, updated_date) VALUES (?,?,?,?,?,?,?,?)",
+                    [
+                        (
+                            idea.id,
+                            idea.title,
+                            idea.description,
+                            notes,
+                            idea.urgency,
+                            0,
+                            idea.created_date,
+                            idea.updated_date,
+                        )
+                        for idea in ideas
+                    ],
                 )
-            else:
-                idea.notes = []
-        except Exception:
-            if raw_notes and raw_notes.strip():
-                idea.notes = [
-                    {"text": raw_notes.strip(), "timestamp": datetime.now().isoformat()}
-                ]
-            else:
-                idea.notes = []
-        # Row layout with archived column: id, title, desc, notes, urgency, archived, created, updated
-        idea.archived = bool(row[5]) if len(row) > 7 else False
-        idea.created_date = row[6] if len(row) > 7 else row[5]
-        idea.updated_date = row[7] if len(row) > 7 else row[6]
+        return ideas
+
+    def _row_to_idea(self, row: sqlite3.Row) -> Idea:
+        idea = Idea(row["title"], row["description"], UrgencyLevel(row["urgency"]))
+        idea.id = row["id"]
+        # Legacy notes without a timestamp get "now"; the freshly built Idea
+        # already holds that value, so reuse it instead of asking again.
+        idea.notes = decode_notes(row["notes"], idea.created_date)
+        # The archived column is guaranteed by schema migration 1
+        idea.archived = bool(row["archived"])
+        idea.created_date = row["created_date"]
+        idea.updated_date = row["updated_date"]
         return idea
 
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        # Same shape as Idea.to_dict() without building the Idea (uuid4,
+        # timestamps, enum lookup) just to throw it away. Legacy notes
+        # lacking a timestamp fall back to the idea's last update.
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["description"],
+            "notes": decode_notes(row["notes"], row["updated_date"]),
+            "urgency": row["urgency"],
+            "archived": bool(row["archived"]),
+            "created_date": row["created_date"],
+            "updated_date": row["updated_date"],
+        }
+
     def get_idea(self, idea_id: str) -> Optional[Idea]:
-        with self._connect() as conn:
+        with self._acquire() as conn:
             cur = conn.execute(
                 "SELECT id, title, description, notes, urgency, archived, created_date, updated_date FROM ideas WHERE id=?",
                 (idea_id,),
@@ -221,55 +399,210 @@ class IdeaStore:
             row = cur.fetchone()
         return self._row_to_idea(row) if row else None
 
-    def get_all_ideas(self) -> List[Idea]:
-        with self._connect() as conn:
-            cur = conn.execute(
-                "SELECT id, title, description, notes, urgency, archived, created_date, updated_date FROM ideas ORDER BY created_date DESC"
-            )
-            rows = cur.fetchall()
-        return [self._row_to_idea(r) for r in rows]
+    def _query_ideas(
+        self,
+        conn: sqlite3.Connection,
+        archived: Optional[bool],
+        after: Optional[Tuple[str, int]] = None,
+        limit: int = -1,
+    ):
+        # Newest first with rowid as tie-breaker, so `after` (the last
+        # row's (created_date, rowid)) resumes exactly where a page ended.
+        where, params = [], []
+        if archived is not None:
+            where.append("archived=?")
+            params.append(1 if archived else 0)
+        if after is not None:
+            where.append("(created_date, rowid) < (?, ?)")
+            params.extend(after)
+        sql = "SELECT rowid, id, title, description, notes, urgency, archived, created_date, updated_date FROM ideas"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_date DESC, rowid DESC LIMIT ?"
+        params.append(limit)
+        return conn.execute(sql, params)
 
-    def update_idea(self, idea_id: str, **kwargs) -> Optional[Idea]:
-        idea = self.get_idea(idea_id)
-        if not idea:
+    @staticmethod
+    def archived_filter(
+        archived_only: bool = False, include_archived: bool = False
+    ) -> Optional[bool]:
+        """Map list-view flags onto the `archived` filter of the queries.
+
+        `archived_only` wins over `include_archived`; with neither set only
+        active ideas are listed. None means "no filter".
+        """
+        if archived_only:
+            return True
+        if include_archived:
             return None
-        idea.update(
-            title=kwargs.get("title"),
-            description=kwargs.get("description"),
-            notes=kwargs.get("notes"),
-            urgency=kwargs.get("urgency"),
-            # Ensure archived flag updates are propagated (was previously omitted)
-            archived=kwargs.get("archived"),
-        )
-        with self._connect() as conn:
-            conn.execute(
-                """
+        return False
+
+    def get_all_ideas(self, archived: Optional[bool] = None) -> List[Idea]:
+        """Return ideas newest first, optionally filtered by archived flag."""
+        with self._acquire() as conn:
+            rows = self._query_ideas(conn, archived).fetchall()
+        return [self._row_to_idea(row) for row in rows]
+
+    def iter_idea_blobs(self, archived: Optional[bool] = None) -> Iterator[bytes]:
+        """Yield ideas newest first, each one as encoded JSON.
+
+        Rows whose `updated_date` matches the cached entry skip notes
+        decoding and dict building entirely. Rows are read in pages of
+        `LIST_PAGE_SIZE` and the read connection goes back to the pool
+        before a page is yielded, so a slow streaming client never holds
+        one while it reads.
+        """
+        after = None
+        while True:
+            with self._acquire() as conn:
+                rows = self._query_ideas(
+                    conn, archived, after, LIST_PAGE_SIZE
+                ).fetchall()
+            for row in rows:
+                idea_id, updated_date = row["id"], row["updated_date"]
+                blob = self._cached_blob(idea_id, updated_date)
+                if blob is None:
+                    blob = orjson.dumps(self._row_to_dict(row))
+                    self._cache_blob(idea_id, updated_date, blob)
+                yield blob
+            if len(rows) < LIST_PAGE_SIZE:
+                return
+            after = (rows[-1]["created_date"], rows[-1]["rowid"])
+
+    @staticmethod
+    def _append_notes_sql(count: int) -> str:
+        # One '$[#]' (end of array) path/value pair per appended note
+        if not count:
+            return "notes"
+        return "json_insert(notes" + ", '$[#]', json(?)" * count + ")"
+
+    def update_idea(self, idea_id: str, **kwargs) -> Optional[Idea]:
+        """Apply a partial update and return the stored idea (None if missing).
+
+        Runs as a single `UPDATE ... RETURNING`: omitted fields keep their
+        value via COALESCE and new notes are appended by SQLite itself
+        (`json_insert` at `$[#]`), so the row is never read back first.
+        """
+        title = kwargs.get("title")
+        description = kwargs.get("description")
+        urgency = kwargs.get("urgency")
+        archived = kwargs.get("archived")
+        if all(v is None for v in (title, description, urgency, archived)):
+            # Notes-only change (the usual PUT): use the narrower statement
+            return self.append_notes(idea_id, kwargs.get("notes"))
+        now = datetime.now().isoformat()
+        new_notes = normalize_notes(kwargs.get("notes"), now)
+        with self._acquire(readonly=False) as conn:
+            rows = conn.execute(
+                f"""
                 UPDATE ideas
-                SET title=?, description=?, notes=?, urgency=?, archived=?, updated_date=?
+                SET title=COALESCE(?, title),
+                    description=COALESCE(?, description),
+                    notes={self._append_notes_sql(len(new_notes))},
+                    urgency=COALESCE(?, urgency),
+                    archived=COALESCE(?, archived),
+                    updated_date=?
                 WHERE id=?
+                RETURNING id, title, description, notes, urgency, archived, created_date, updated_date
                 """,
                 (
-                    idea.title,
-                    idea.description,
-                    json.dumps(idea.notes),
-                    idea.urgency,
-                    1 if idea.archived else 0,
-                    idea.updated_date,
-                    idea.id,
+                    title,
+                    description,
+                    *(orjson.dumps(note).decode() for note in new_notes),
+                    urgency,
+                    None if archived is None else int(bool(archived)),
+                    now,
+                    idea_id,
+                ),
+            ).fetchall()
+        self._invalidate(idea_id)
+        return self._row_to_idea(rows[0]) if rows else None
+
+    def append_notes(self, idea_id: str, notes: Any) -> Optional[Idea]:
+        """Append note(s) to an idea, leaving every other field untouched.
+
+        The common "add a note" update only writes the notes and
+        updated_date columns; existing notes are never decoded in Python.
+        """
+        now = datetime.now().isoformat()
+        new_notes = normalize_notes(notes, now)
+        with self._acquire(readonly=False) as conn:
+            rows = conn.execute(
+                f"""
+                UPDATE ideas
+                SET notes={self._append_notes_sql(len(new_notes))}, updated_date=?
+                WHERE id=?
+                RETURNING id, title, description, notes, urgency, archived, created_date, updated_date
+                """,
+                (
+                    *(orjson.dumps(note).decode() for note in new_notes),
+                    now,
+                    idea_id,
                 ),
+            ).fetchall()
+        self._invalidate(idea_id)
+        return self._row_to_idea(rows[0]) if rows else None
+
+    def set_archived(self, idea_id: str, archived: bool) -> bool:
+        """Archive or restore an idea; returns False if it does not exist.
+
+        A single UPDATE flips the flag only when it actually changes. When
+        nothing was written, a primary-key lookup tells an unknown id from
+        an idea that was already in the requested state.
+        """
+        flag = 1 if archived else 0
+        now = datetime.now().isoformat()
+        with self._acquire(readonly=False) as conn:
+            cur = conn.execute(
+                "UPDATE ideas SET archived=?, updated_date=? WHERE id=? AND archived != ?",
+                (flag, now, idea_id, flag),
             )
-            conn.commit()
-        return idea
+        if cur.rowcount > 0:
+            self._invalidate(idea_id)
+            return True
+        with self._acquire() as conn:
+            row = conn.execute("SELECT 1 FROM ideas WHERE id=?", (idea_id,)).fetchone()
+        return row is not None
 
     def delete_idea(self, idea_id: str) -> bool:
-        with self._connect() as conn:
+        with self._acquire(readonly=False) as conn:
             cur = conn.execute("DELETE FROM ideas WHERE id=?", (idea_id,))
-            conn.commit()
-            return cur.rowcount > 0
+        self._invalidate(idea_id)
+        return cur.rowcount > 0
 
     # --- utility ----------------------------------------------------------
+    def get_stats(self) -> Dict[str, Any]:
+        """Idea counts per urgency level, split into active and archived.
+
+        Aggregation runs inside SQLite (one grouped scan); no rows or notes
+        are materialised in Python.
+        """
+        by_urgency = {
+            str(level.value): {"active": 0, "archived": 0}
+            for level in sorted(UrgencyLevel, key=lambda lvl: lvl.value)
+        }
+        with self._acquire() as conn:
+            rows = conn.execute(
+                "SELECT urgency, archived, COUNT(1) FROM ideas GROUP BY urgency, archived"
+            ).fetchall()
+        active = archived = 0
+        for urgency, is_archived, count in rows:
+            bucket = by_urgency.setdefault(str(urgency), {"active": 0, "archived": 0})
+            if is_archived:
+                bucket["archived"] += count
+                archived += count
+            else:
+                bucket["active"] += count
+                active += count
+        return {
+            "total": active + archived,
+            "active": active,
+            "archived": archived,
+            "by_urgency": by_urgency,
+        }
+
     def is_empty(self) -> bool:
-        with self._connect() as conn:
+        with self._acquire() as conn:
             cur = conn.execute("SELECT COUNT(1) FROM ideas")
             (count,) = cur.fetchone()
         return count == 0
@@ -5,6 +5,7 @@ Make sure the server is running (python app.py) before running this script.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 
@@ -15,6 +16,10 @@ BASE_URL = os.environ.get(
     "REMEMBERBOOK_BASE_URL", f"http://localhost:{os.environ.get('PORT', '5055')}"
 )
 
+# One keep-alive session for every call instead of a new connection per request
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 
 def test_api():
     print("Testing Remember Book API...")
@@ -22,14 +27,14 @@ def test_api():
 
     # Test 1: Get API info
     print("1. Getting API info...")
-    response = requests.get(f"{BASE_URL}/")
+    response = SESSION.get(f"{BASE_URL}/")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     print()
 
     # Test 2: Get all ideas (should include sample data)
     print("2. Getting all (non-archived) ideas...")
-    response = requests.get(f"{BASE_URL}/ideas")
+    response = SESSION.get(f"{BASE_URL}/ideas")
     print(f"Status: {response.status_code}")
     ideas = response.json()
     print(f"Found {len(ideas)} ideas:")
@@ -44,7 +49,7 @@ def test_api():
         "description": "Create a simple React app to interact with this API",
         "urgency": 4,
     }
-    response = requests.post(f"{BASE_URL}/ideas", json=new_idea)
+    response = SESSION.post(f"{BASE_URL}/ideas", json=new_idea)
     print(f"Status: {response.status_code}")
     created_idea = response.json()
     idea_id = created_idea["id"]
@@ -54,7 +59,7 @@ def test_api():
 
     # Test 4: Get the specific idea
     print("4. Getting the specific idea...")
-    response = requests.get(f"{BASE_URL}/ideas/{idea_id}")
+    response = SESSION.get(f"{BASE_URL}/ideas/{idea_id}")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     print()
@@ -64,14 +69,14 @@ def test_api():
     update_data = {
         "notes": "Start with Create React App and add components for idea management"
     }
-    response = requests.put(f"{BASE_URL}/ideas/{idea_id}", json=update_data)
+    response = SESSION.put(f"{BASE_URL}/ideas/{idea_id}", json=update_data)
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     print()
 
     # Test 6: Get all ideas again to see the update
     print("6. Getting all ideas again (verify note append)...")
-    response = requests.get(f"{BASE_URL}/ideas")
+    response = SESSION.get(f"{BASE_URL}/ideas")
     print(f"Status: {response.status_code}")
     ideas = response.json()
     print(f"Now have {len(ideas)} ideas:")
@@ -86,14 +91,14 @@ def test_api():
 
     # Test 7: Delete the created idea
     print("7. Deleting the created idea...")
-    response = requests.delete(f"{BASE_URL}/ideas/{idea_id}")
+    response = SESSION.delete(f"{BASE_URL}/ideas/{idea_id}")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     print()
 
     # Test 8: Verify deletion
     print("8. Verifying deletion...")
-    response = requests.get(f"{BASE_URL}/ideas")
+    response = SESSION.get(f"{BASE_URL}/ideas")
     ideas = response.json()
     print(f"Back to {len(ideas)} ideas")
     print()
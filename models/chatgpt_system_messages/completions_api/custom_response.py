@@ -1,6 +1,7 @@
 # Custom Response Handling with GitHub Models and the Chat Completions API
 
 import os
+import re
 from openai import OpenAI
 
 
@@ -22,7 +23,24 @@ default_instructions = {
 complaint_instructions = """You are handling a customer complaint. Show genuine empathy and concern. Acknowledge their frustration explicitly. Focus on immediate resolution steps. Use phrases like 'I understand how frustrating this must be' and 'Let me help you resolve this right away.' Be apologetic and action-oriented."""
 
 
+# Obvious complaint wording, matched locally before asking the model.
+# "refund" is left out: asking how refunds work is not a complaint.
+complaint_pattern = re.compile(
+    r"\b(disappoint|broken|angry|frustrat|terrible|awful|unacceptable)\w*\b",
+    re.IGNORECASE,
+)
+
+# "No complaints", "not disappointed at all": negated wording goes to the LLM
+negation_pattern = re.compile(
+    r"\b(not|no|never|nothing|none|without)\b|n't\b", re.IGNORECASE
+)
+
+
 def check_for_complaint(user_message):
+    # Clear complaints skip the classification round-trip entirely
+    is_negated = negation_pattern.search(user_message)
+    if complaint_pattern.search(user_message) and not is_negated:
+        return True
 
     sentiment_check = client.chat.completions.create(
         model=model,
@@ -0,0 +1,29 @@
+# Shared OpenAI clients for the Responses API examples
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+# Connections stay open between requests, so only the first call to the API
+# pays for the TCP and TLS handshakes. With HTTP/2, concurrent requests are
+# multiplexed as streams over those connections instead of each needing a
+# socket of its own.
+connection_limits = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=100,
+    keepalive_expiry=120,
+)
+
+# Fail fast on connect; replies themselves can take a while to generate
+request_timeout = httpx.Timeout(60.0, connect=5.0)
+
+client = OpenAI(
+    http_client=DefaultHttpxClient(
+        http2=True, limits=connection_limits, timeout=request_timeout
+    ),
+)
+
+async_client = AsyncOpenAI(
+    http_client=DefaultAsyncHttpxClient(
+        http2=True, limits=connection_limits, timeout=request_timeout
+    ),
+)
@@ -1,8 +1,6 @@
 # Basic Response Handling with OpenAI API and the Responses API
 
-from openai import OpenAI
-
-client = OpenAI()
+from _client import client
 
 # Set the model to use
 model = "gpt-5-nano"
@@ -13,13 +11,16 @@ default_instructions = {
     "content": "You are a friendly customer service representative for ShopFast, an e-commerce platform. Provide helpful, informative responses. Keep answers concise and professional.",
 }
 
-# Customer asks a general question
-response = client.responses.create(
+# Customer asks a general question; the reply is streamed so text prints as soon as it is generated
+with client.responses.stream(
     model=model,
     input=[
         default_instructions,
         {"role": "user", "content": "What's your return policy?"},
     ],
-)
+) as stream:
+    for event in stream:
+        if event.type == "response.output_text.delta":
+            print(event.delta, end="", flush=True)
 
-print(response.output_text)
+print()
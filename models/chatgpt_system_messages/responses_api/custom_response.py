@@ -1,12 +1,131 @@
 # Custom Response Handling with OpenAI API and the Responses API
 
-from openai import OpenAI
+import argparse
+import asyncio
+import functools
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Final
 
-client = OpenAI()
+import orjson
+import tiktoken
+from openai.types.responses import Response
+
+from _client import async_client as client
 
 # Set the model to use
 model = "gpt-5-nano"
 
+# Short support replies (and picking a persona) need almost no hidden
+# reasoning, and reasoning tokens are generated before the first visible one
+reasoning = {"effort": "minimal"}
+
+# Cap on requests in flight at once, so a large batch of messages
+# doesn't burst past the account's requests-per-minute limit
+max_concurrent_requests = 8
+request_slots = asyncio.Semaphore(max_concurrent_requests)
+
+# Account rate limits, used to pace requests before the API has to reject them
+requests_per_minute = int(os.environ.get("OPENAI_RPM", "500"))
+tokens_per_minute = int(os.environ.get("OPENAI_TPM", "200000"))
+
+# Output tokens budgeted per request when estimating its TPM cost
+expected_output_tokens = 1024
+
+
+# Leaky buckets for requests and tokens per minute. acquire() waits until
+# both have room, so bursts are spread out instead of bouncing off 429s.
+class RateLimiter:
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.available_requests = float(requests_per_minute)
+        self.available_tokens = float(tokens_per_minute)
+        self.last_refill = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        minutes = (now - self.last_refill) / 60
+        self.last_refill = now
+        self.available_requests = min(
+            self.requests_per_minute,
+            self.available_requests + minutes * self.requests_per_minute,
+        )
+        self.available_tokens = min(
+            self.tokens_per_minute,
+            self.available_tokens + minutes * self.tokens_per_minute,
+        )
+
+    async def acquire(self, tokens):
+        # A single request larger than the whole budget still has to go through
+        tokens = min(tokens, self.tokens_per_minute)
+
+        # Waiters queue on the lock, so requests go out in arrival order
+        async with self.lock:
+            while True:
+                self.refill()
+                if self.available_requests >= 1 and self.available_tokens >= tokens:
+                    self.available_requests -= 1
+                    self.available_tokens -= tokens
+                    return
+
+                # Sleep until whichever bucket is short has refilled enough
+                missing_requests = max(0.0, 1 - self.available_requests)
+                missing_tokens = max(0.0, tokens - self.available_tokens)
+                await asyncio.sleep(
+                    60
+                    * max(
+                        missing_requests / self.requests_per_minute,
+                        missing_tokens / self.tokens_per_minute,
+                    )
+                )
+
+
+rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+
+@functools.cache
+def token_encoding():
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Newer models than this tiktoken release knows about
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(content):
+    # Content is a plain string or a list of content parts
+    text = content if isinstance(content, str) else json.dumps(content)
+    return len(token_encoding().encode(text))
+
+
+# Rough TPM cost of a request: instructions and input text plus the output budget
+def estimate_tokens(request):
+    prompt_tokens = count_tokens(request.get("instructions") or "")
+    request_input = request["input"]
+    if isinstance(request_input, str):
+        prompt_tokens += count_tokens(request_input)
+    else:
+        for item in request_input:
+            prompt_tokens += count_tokens(item.get("content", ""))
+
+    return prompt_tokens + request.get("max_output_tokens", expected_output_tokens)
+
+
+@asynccontextmanager
+async def request_slot(request):
+    # Wait for rate-limit headroom first, then for a concurrency slot
+    await rate_limiter.acquire(estimate_tokens(request))
+    async with request_slots:
+        yield
+
+
 # Default developer instructions
 default_instructions = {
     "role": "developer",
@@ -14,45 +133,298 @@ default_instructions = {
 }
 
 
-def check_for_complaint(user_message):
+# Instruction strings are built once at import and shared by every request
+complaint_instructions: Final = """You are handling a customer complaint. Show genuine empathy and concern. Acknowledge their frustration explicitly. Focus on immediate resolution steps. Use phrases like 'I understand how frustrating this must be' and 'Let me help you resolve this right away.' Be apologetic and action-oriented."""
+
+# Both personas plus a routing rule, so the model classifies the message
+# itself instead of needing a separate sentiment request first
+routed_instructions: Final = f"""{default_instructions["content"]}
+
+Before replying, decide whether the customer's message is a complaint or expresses frustration.
+- If it does, reply in complaint mode: {complaint_instructions}
+- Otherwise, reply in the default tone described above."""
+
+# Complaint persona on top of the company context, for messages that are clearly complaints
+complaint_mode_instructions: Final = (
+    f"{default_instructions['content']}\n\n{complaint_instructions}"
+)
+
+# Obvious complaint wording, matched locally so the model doesn't have to
+# classify it. Words like "refund" are left out: asking how refunds work is
+# a plain question, not a complaint.
+complaint_pattern = re.compile(
+    r"\b(disappoint|broken|angry|frustrat|terrible|awful|complain|worst|unacceptable|never again)\w*\b",
+    re.IGNORECASE,
+)
+
+# Negated complaint wording ("no complaints", "not disappointed at all") is
+# usually praise, so a complaint hit next to one of these is left to the model
+negation_pattern = re.compile(
+    r"\b(not|no|never|nothing|none|without)\b|n't\b", re.IGNORECASE
+)
+
+# Plain questions and thanks get the default tone directly...
+neutral_pattern = re.compile(
+    r"^\s*(?:(?:how|what|when|where|which|who|can|could|do|does|is|are|will|would)\b[^!]*\?|(?:thanks|thank you)\b[^!?]*)\s*$",
+    re.IGNORECASE,
+)
+
+# ...unless they carry negative wording ("Thanks for nothing", "why is my
+# package still missing?"), which is left to the model
+negative_pattern = re.compile(
+    r"\b(not|no|nothing|never|still|missing|late|wrong|useless|waste|ridiculous|horrible|bad|poor|scam|joke|again)\b|n't\b",
+    re.IGNORECASE,
+)
+
+
+def select_instructions(user_message):
+    is_complaint = bool(complaint_pattern.search(user_message))
+    is_negated = bool(negation_pattern.search(user_message))
+    is_neutral = bool(
+        neutral_pattern.match(user_message)
+        and not negative_pattern.search(user_message)
+    )
+    # Only short-circuit when exactly one side matches
+    if is_complaint and not is_neutral and not is_negated:
+        return complaint_mode_instructions
+    if is_neutral and not is_complaint:
+        return default_instructions["content"]
+    # Ambiguous: let the model pick the persona as part of its reply
+    return routed_instructions
+
+
+# Replies cached in memory by previous response and message, so a question
+# repeated within one process is answered without another request. The cache
+# starts empty on every run, and identical calls already in flight each
+# still send their own request.
+response_cache_size = 4096
+response_cache = {}
+
+
+async def create_response(**kwargs):
+    # Every API call is paced by the rate limiter and the concurrency budget.
+    # The body is posted as raw orjson-encoded content, which skips the SDK's
+    # per-call parameter transform as well as stdlib json encoding.
+    async with request_slot(kwargs):
+        return await client.post(
+            "/responses", cast_to=Response, content=orjson.dumps(kwargs)
+        )
+
+
+async def stream_response(on_delta, **kwargs):
+    # Text is handed to on_delta as it arrives; the full response is still returned at the end
+    async with request_slot(kwargs):
+        async with client.responses.stream(**kwargs) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    on_delta(event.delta)
+            return await stream.get_final_response()
+
+
+# Get response with custom handling for complaints using the `instructions` parameter to route between personas in a single call.
+# Conversations are chained server-side: pass the previous reply's `id` as previous_response_id to continue one.
+async def get_response(user_message, previous_response_id=None, on_delta=None):
+    cache_key = (previous_response_id, user_message)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        if on_delta:
+            on_delta(cached.output_text)
+        return cached
+
+    # Only the new turn is sent; earlier turns stay on the server, and
+    # truncation="auto" drops the oldest ones if the context fills up.
+    # A plain string input is read as one user message, so no per-call
+    # message list or dict is needed.
+    request = {
+        "model": model,
+        "input": user_message,
+        "instructions": select_instructions(user_message),
+        "reasoning": reasoning,
+        "previous_response_id": previous_response_id,
+        "truncation": "auto",
+    }
+    if on_delta:
+        # Stream so the caller can use the first tokens while the rest are in flight
+        response = await stream_response(on_delta, **request)
+    else:
+        response = await create_response(**request)
+
+    # Failed or incomplete replies are returned but not cached, so asking
+    # again sends a fresh request
+    if response.status == "completed":
+        if len(response_cache) >= response_cache_size:
+            # Evict the oldest entry; dicts keep insertion order
+            del response_cache[next(iter(response_cache))]
+        response_cache[cache_key] = response
+
+    return response
+
+
+# Number of customer messages answered per combined request. Latency grows
+# with the batch, just more slowly than the request count falls, so this is
+# worth sweeping (e.g. 4/8/16) against the account's RPM and TPM limits.
+batch_size = 8
+
+batch_reply_prompt: Final = (
+    "Reply to each numbered customer message separately, "
+    "as if each came from a different customer:\n"
+)
+
+# Structured output for combined requests: one reply per numbered message
+batch_reply_format = {
+    "type": "json_schema",
+    "name": "batch_replies",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "replies": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "reply": {"type": "string"},
+                    },
+                    "required": ["id", "reply"],
+                    "additionalProperties": False,
+                },
+            }
+        },
+        "required": ["replies"],
+        "additionalProperties": False,
+    },
+}
+
+
+# Answer several independent messages with one request and split the replies back out by number
+async def get_responses_batch(messages):
+    numbered = "\n".join(f"{idx}. {message}" for idx, message in enumerate(messages, 1))
 
-    sentiment_check = client.responses.create(
+    response = await create_response(
         model=model,
         input=[
             {
                 "role": "user",
-                "content": f"Is this message a complaint or expressing frustration? Answer only 'yes' or 'no': {user_message}",
+                "content": batch_reply_prompt + numbered,
             }
         ],
+        instructions=routed_instructions,
+        reasoning=reasoning,
+        text={"format": batch_reply_format},
     )
 
-    return sentiment_check.output_text.strip().lower() == "yes"
+    # A truncated or refused reply has no usable JSON; every message then
+    # falls back to its own request below
+    reply_by_id = {}
+    if response.status == "completed":
+        try:
+            replies = json.loads(response.output_text)["replies"]
+            reply_by_id = {reply["id"]: reply["reply"] for reply in replies}
+        except (ValueError, KeyError, TypeError):
+            pass
+    # Ids outside 1..N mean the model renumbered, so none of them can be trusted
+    if not set(reply_by_id) <= set(range(1, len(messages) + 1)):
+        reply_by_id = {}
+
+    # The schema can't force ids 1..N, so a skipped message is answered
+    # individually instead of failing the whole batch
+    missing = [idx for idx in range(1, len(messages) + 1) if not reply_by_id.get(idx)]
+    fallbacks = await asyncio.gather(
+        *(get_response(messages[idx - 1]) for idx in missing)
+    )
+    for idx, fallback in zip(missing, fallbacks):
+        reply_by_id[idx] = fallback.output_text
+
+    return [reply_by_id[idx] for idx in range(1, len(messages) + 1)]
+
+
+# Seconds between Batch API status checks when the API gives no hint
+batch_poll_interval = 30
 
 
-# Get response with custom handling for complaints using the `instructions` parameter to override developer instructions
-def get_response(user_message, conversation_history=[]):
-    # Check for complaint
-    is_complaint = check_for_complaint(user_message)
+# Write one /v1/responses request per message, with the same body get_response sends
+def build_batch_jsonl(messages, path=None):
+    path = path or os.path.join(tempfile.gettempdir(), "custom_response_batch.jsonl")
 
-    # Build the input with conversation history
-    messages = (
-        [default_instructions]
-        + conversation_history
-        + [{"role": "user", "content": user_message}]
+    with open(path, "w", encoding="utf-8") as f:
+        for idx, message in enumerate(messages, start=1):
+            request = {
+                "custom_id": f"message-{idx}",
+                "method": "POST",
+                "url": "/v1/responses",
+                "body": {
+                    "model": model,
+                    "input": message,
+                    "instructions": select_instructions(message),
+                    "reasoning": reasoning,
+                },
+            }
+            f.write(json.dumps(request) + "\n")
+
+    return path
+
+
+# Raw response bodies from the output file have no output_text helper, so join the text parts
+def response_body_text(body):
+    return "".join(
+        part["text"]
+        for item in body["output"]
+        if item["type"] == "message"
+        for part in item["content"]
+        if part["type"] == "output_text"
     )
 
-    # If complaint detected, override with empathetic instructions
-    if is_complaint:
-        response = client.responses.create(
-            model=model,
-            input=messages,
-            instructions="""You are handling a customer complaint. Show genuine empathy and concern. Acknowledge their frustration explicitly. Focus on immediate resolution steps. Use phrases like 'I understand how frustrating this must be' and 'Let me help you resolve this right away.' Be apologetic and action-oriented.""",
-        )
-    else:
-        # Use default developer instructions (no override)
-        response = client.responses.create(model=model, input=messages)
 
-    return response
+# Run the messages through the Batch API: half the token cost and a separate
+# rate-limit pool, in exchange for results arriving within 24 hours
+async def run_batch(messages):
+    path = build_batch_jsonl(messages)
+    try:
+        batch_file = await client.files.create(file=Path(path), purpose="batch")
+    finally:
+        os.remove(path)
+
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/responses",
+        completion_window="24h",
+    )
+
+    # Poll without blocking the event loop, at the pace the API suggests
+    # through openai-poll-after-ms when it sends one
+    poll_delay = batch_poll_interval
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        await asyncio.sleep(poll_delay)
+        raw_batch = await client.batches.with_raw_response.retrieve(batch.id)
+        batch = raw_batch.parse()
+
+        poll_after_ms = raw_batch.headers.get("openai-poll-after-ms")
+        poll_delay = int(poll_after_ms) / 1000 if poll_after_ms else batch_poll_interval
+
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} finished with status '{batch.status}'")
+
+    # Stream the output file line by line rather than loading it whole
+    reply_by_id = {}
+    if batch.output_file_id:
+        async with client.files.with_streaming_response.content(
+            batch.output_file_id
+        ) as output:
+            async for line in output.iter_lines():
+                if not line:
+                    continue
+                result = json.loads(line)
+                if result["response"] and result["response"]["status_code"] == 200:
+                    body = result["response"]["body"]
+                    reply_by_id[result["custom_id"]] = response_body_text(body)
+
+    # Failed requests are listed in the batch's error file instead
+    missing = f"(no reply, see error file {batch.error_file_id})"
+    return [
+        reply_by_id.get(f"message-{idx}", missing)
+        for idx in range(1, len(messages) + 1)
+    ]
 
 
 # Example usage
@@ -63,7 +435,50 @@ test_messages = [
     "I'm very disappointed. My order arrived broken and customer service hasn't responded!",
 ]
 
-for idx, message in enumerate(test_messages, start=1):
-    print(f"Processing message {idx}: '{message}'...")
-    response = get_response(message)
-    print(f"Response {idx}:\n{response.output_text}\n")
+
+async def main(mode):
+    # The first encoding load may download its BPE file; do it in a thread
+    # once, before any request_slot can hit it on the event loop
+    await asyncio.to_thread(token_encoding)
+
+    if mode == "combined":
+        # batch_size messages per request, with the requests themselves in flight together
+        batches = [
+            test_messages[start : start + batch_size]
+            for start in range(0, len(test_messages), batch_size)
+        ]
+        results = await asyncio.gather(*(get_responses_batch(b) for b in batches))
+        replies = [reply for batch in results for reply in batch]
+    elif mode == "batch-api":
+        # Nobody waits on an offline run, so trade latency for cost
+        replies = await run_batch(test_messages)
+    elif mode == "stream":
+        # One message at a time, printing each reply as it is generated
+        for idx, message in enumerate(test_messages, start=1):
+            print(f"Processing message {idx}: '{message}'...")
+            print(f"Response {idx}:")
+            await get_response(
+                message, on_delta=lambda text: print(text, end="", flush=True)
+            )
+            print("\n")
+        return
+    else:
+        # All messages are sent at once; total time is roughly the slowest
+        # message rather than the sum of all of them
+        responses = await asyncio.gather(*(get_response(m) for m in test_messages))
+        replies = [response.output_text for response in responses]
+
+    for idx, (message, reply) in enumerate(zip(test_messages, replies), start=1):
+        print(f"Processing message {idx}: '{message}'...")
+        print(f"Response {idx}:\n{reply}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--mode",
+        choices=["concurrent", "stream", "combined", "batch-api"],
+        default="concurrent",
+        help="one request per message (concurrent), one streamed reply at a time (stream), several messages per request (combined), or an offline Batch API job (batch-api)",
+    )
+    asyncio.run(main(parser.parse_args().mode))